@@ -0,0 +1,106 @@
+import os
+import random
+from typing import List
+
+import pytest
+
+from g2p_id import BERT, LSTM, G2p, TextProcessor
+from g2p_id.g2p import construct_homographs_dictionary, construct_lexicon_dictionary
+
+SEED = 42
+ONSETS = ["", "b", "c", "d", "g", "h", "j", "k", "l", "m", "n", "ng", "ny", "p", "r", "s", "t", "w", "y"]
+NUCLEI = ["a", "e", "i", "o", "u"]
+CODAS = ["", "", "", "k", "l", "m", "n", "ng", "r", "s", "t"]
+PUNCTUATIONS = [".", ",", "?", "!"]
+
+
+def make_oov_word(rng: random.Random, vocabulary: set, max_length: int = 20) -> str:
+    """Builds a pseudo-Indonesian word, made of CV(C) syllables, that is not in `vocabulary`."""
+    while True:
+        num_syllables = rng.randint(2, 5)
+        word = "".join(rng.choice(ONSETS) + rng.choice(NUCLEI) + rng.choice(CODAS) for _ in range(num_syllables))
+        if word not in vocabulary and len(word) <= max_length:
+            return word
+
+
+def make_corpus(num_sentences: int, sentence_length: int, oov_rate: float, seed: int = SEED) -> List[str]:
+    """Generates a synthetic Indonesian corpus with a controlled OOV rate and sentence length.
+
+    Args:
+        num_sentences (int): Number of sentences to generate.
+        sentence_length (int): Number of words per sentence.
+        oov_rate (float): Probability of a word being out of the lexicon and homograph lists.
+        seed (int, optional): Random seed. Defaults to `SEED`.
+
+    Returns:
+        List[str]: Generated sentences.
+    """
+    rng = random.Random(seed)
+    lexicon = construct_lexicon_dictionary()
+    homographs = construct_homographs_dictionary()
+    vocabulary = sorted(word for word in lexicon if word.isalpha()) + sorted(homographs)
+    known = set(lexicon) | set(homographs)
+
+    sentences = []
+    for _ in range(num_sentences):
+        words = [
+            make_oov_word(rng, known) if rng.random() < oov_rate else rng.choice(vocabulary)
+            for _ in range(sentence_length)
+        ]
+        words[0] = words[0].capitalize()
+        sentences.append(" ".join(words) + rng.choice(PUNCTUATIONS))
+    return sentences
+
+
+# without a word cache, so that every round runs the whole pipeline, including OOV predictions
+@pytest.fixture(scope="session")
+def g2p_bert():
+    return G2p(model_type="BERT", word_cache_size=0)
+
+
+@pytest.fixture(scope="session")
+def g2p_lstm():
+    return G2p(model_type="LSTM", word_cache_size=0)
+
+
+@pytest.fixture(scope="session")
+def g2p_rules():
+    return G2p(model_type="RULES", word_cache_size=0)
+
+
+@pytest.fixture(scope="session")
+def bert():
+    return BERT()
+
+
+@pytest.fixture(scope="session")
+def lstm():
+    return LSTM()
+
+
+@pytest.fixture(scope="session")
+def text_processor():
+    return TextProcessor()
+
+
+@pytest.fixture(scope="session")
+def oov_words():
+    rng = random.Random(SEED)
+    known = set(construct_lexicon_dictionary()) | set(construct_homographs_dictionary())
+    return [make_oov_word(rng, known) for _ in range(int(os.environ.get("G2P_BENCH_OOV_WORDS", "50")))]
+
+
+@pytest.fixture(scope="session", params=[8, 32], ids=lambda length: f"len{length}")
+def sentence_length(request):
+    return request.param
+
+
+@pytest.fixture(scope="session", params=[0.0, 0.1, 0.3], ids=lambda rate: f"oov{rate}")
+def oov_rate(request):
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def corpus(sentence_length, oov_rate):
+    num_sentences = int(os.environ.get("G2P_BENCH_SENTENCES", "20"))
+    return make_corpus(num_sentences, sentence_length, oov_rate)
@@ -0,0 +1,53 @@
+import gc
+import os
+import sys
+
+import pytest
+
+from conftest import make_corpus
+from g2p_id import G2p
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/self/smaps_rollup")
+
+
+def private_memory_kb() -> int:
+    """Memory private to the current process (not shared with its parent), in kilobytes."""
+    with open("/proc/self/smaps_rollup", encoding="utf-8") as file:
+        return sum(int(line.split()[1]) for line in file if line.startswith(("Private_Clean", "Private_Dirty")))
+
+
+def worker_private_memory_kb(g2p: G2p, corpus) -> int:
+    """Forks a worker which phonemizes `corpus`, and returns its private memory."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # worker
+        os.close(read_fd)
+        gc.enable()
+        for sentence in corpus:
+            g2p(sentence)
+        gc.collect()
+        os.write(write_fd, str(private_memory_kb()).encode())
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as file:
+        private_kb = int(file.read())
+    os.waitpid(pid, 0)
+    return private_kb
+
+
+@pytest.mark.parametrize("prepare_for_fork", [False, True], ids=["plain", "prepare_for_fork"])
+def test_worker_rss(benchmark, prepare_for_fork):
+    """Private memory per forked worker of a `G2p` created in the parent process."""
+    corpus = make_corpus(20, 16, 0.1)
+    if prepare_for_fork:
+        gc.disable()
+    g2p = G2p(word_cache_size=0)
+    if prepare_for_fork:
+        g2p.prepare_for_fork()
+    try:
+        results = []
+        benchmark.pedantic(lambda: results.append(worker_private_memory_kb(g2p, corpus)), rounds=3, iterations=1)
+    finally:
+        gc.unfreeze()
+        gc.enable()
+    benchmark.extra_info["worker_private_kb"] = min(results)
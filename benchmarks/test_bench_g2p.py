@@ -0,0 +1,145 @@
+import json
+import subprocess
+import sys
+import tracemalloc
+from collections import Counter
+
+import pytest
+
+from g2p_id import G2p
+
+
+def record_peak_memory(benchmark, function):
+    """Records the peak memory traced by `tracemalloc` during one extra call of `function`.
+    Unlike the process' peak RSS, this is specific to the benchmarked call, and includes NumPy buffers,
+    but not the native allocations of ONNX Runtime.
+    """
+    tracemalloc.start()
+    try:
+        function()
+        benchmark.extra_info["peak_traced_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run_corpus(benchmark, corpus, function):
+    benchmark(function)
+    benchmark.extra_info["sentences"] = len(corpus)
+    benchmark.extra_info["words"] = sum(len(sentence.split()) for sentence in corpus)
+    record_peak_memory(benchmark, function)
+
+
+def run_words(benchmark, words, function):
+    benchmark(function)
+    benchmark.extra_info["words"] = len(words)
+    record_peak_memory(benchmark, function)
+
+
+def test_normalize(benchmark, text_processor, corpus):
+    run_corpus(benchmark, corpus, lambda: [text_processor.normalize(sentence) for sentence in corpus])
+
+
+def test_preprocess(benchmark, g2p_bert, corpus):
+    run_corpus(benchmark, corpus, lambda: [g2p_bert._preprocess(sentence) for sentence in corpus])
+
+
+def test_tagging(benchmark, g2p_bert, corpus):
+    words = [g2p_bert._tokenize(g2p_bert._preprocess(sentence)) for sentence in corpus]
+    run_corpus(benchmark, corpus, lambda: [g2p_bert.tagger.tag(sentence) for sentence in words])
+
+
+def test_lookup(benchmark, g2p_bert, corpus):
+    """`G2p._lookup` of every tagged word, bypassing the word cache: punctuation, homographs, lexicon,
+    morphology and, for OOV words, neural network prediction."""
+    tokens = [token for sentence in corpus for token in g2p_bert._tag(sentence)]
+    sources = Counter(g2p_bert._lookup(word, pos)[1] for word, pos in tokens)
+    benchmark.extra_info.update(sources)
+    benchmark.extra_info["hit_rate"] = 1 - sources["oov_predictions"] / max(len(tokens), 1)
+    run_corpus(benchmark, corpus, lambda: [g2p_bert._lookup(word, pos) for word, pos in tokens])
+
+
+def test_bert_predict(benchmark, bert, oov_words):
+    run_words(benchmark, oov_words, lambda: [bert.predict(word) for word in oov_words])
+
+
+def test_lstm_predict(benchmark, lstm, oov_words):
+    run_words(benchmark, oov_words, lambda: [lstm.predict(word) for word in oov_words])
+
+
+def test_bert_predict_batch(benchmark, bert, oov_words):
+    run_words(benchmark, oov_words, lambda: bert.predict_batch(oov_words))
+
+
+def test_lstm_predict_batch(benchmark, lstm, oov_words):
+    run_words(benchmark, oov_words, lambda: lstm.predict_batch(oov_words))
+
+
+def test_g2p_bert(benchmark, g2p_bert, corpus):
+    run_corpus(benchmark, corpus, lambda: [g2p_bert(sentence) for sentence in corpus])
+
+
+def test_g2p_bert_warm_cache(benchmark, corpus):
+    """Repeated texts with the default word cache, where every round after the first only hits the cache."""
+    g2p = G2p(model_type="BERT")
+    run_corpus(benchmark, corpus, lambda: [g2p(sentence) for sentence in corpus])
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_g2p_map_threads(benchmark, g2p_bert, corpus, max_workers):
+    run_corpus(benchmark, corpus, lambda: g2p_bert.map_threads(corpus, max_workers=max_workers))
+
+
+def test_g2p_to_ids(benchmark, g2p_bert, corpus):
+    run_corpus(benchmark, corpus, lambda: [g2p_bert.to_ids(sentence) for sentence in corpus])
+
+
+def test_g2p_lstm(benchmark, g2p_lstm, corpus):
+    run_corpus(benchmark, corpus, lambda: [g2p_lstm(sentence) for sentence in corpus])
+
+
+def test_g2p_rules(benchmark, g2p_rules, corpus):
+    run_corpus(benchmark, corpus, lambda: [g2p_rules(sentence) for sentence in corpus])
+
+
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from g2p_id import G2p
+construct_start = time.perf_counter()
+g2p = G2p.load_snapshot(sys.argv[2]) if len(sys.argv) > 2 else G2p(model_type=sys.argv[1])
+construct = time.perf_counter() - construct_start
+g2p("Apel itu berwarna merah.")
+elapsed = time.perf_counter() - start
+try:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak // 1024 if sys.platform == "darwin" else peak
+except ImportError:
+    peak = -1
+print(json.dumps({"seconds": elapsed, "construct_seconds": construct, "peak_rss_kb": peak}))
+"""
+
+
+@pytest.mark.parametrize("snapshot", [False, True], ids=["construct", "snapshot"])
+@pytest.mark.parametrize("model_type", ["BERT", "LSTM", "RULES"])
+def test_cold_start(benchmark, tmp_path, model_type, snapshot):
+    """Import, construct (or load from a snapshot) and run a first call in a fresh interpreter."""
+    args = [model_type]
+    if snapshot:
+        args.append(str(tmp_path / "g2p.pkl"))
+        G2p(model_type=model_type).save_snapshot(args[1])
+    results = []
+
+    def cold_start():
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START_SCRIPT, *args],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    benchmark.pedantic(cold_start, rounds=3, iterations=1)
+    benchmark.extra_info["in_process_seconds"] = min(result["seconds"] for result in results)
+    benchmark.extra_info["construct_seconds"] = min(result["construct_seconds"] for result in results)
+    benchmark.extra_info["peak_rss_kb"] = max(result["peak_rss_kb"] for result in results)
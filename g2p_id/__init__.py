@@ -14,11 +14,46 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from .bert import BERT
-from .g2p import G2p
-from .lstm import LSTM
-from .onnx_utils import WrapInferenceSession
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from .g2p import G2p, PhonemeIds
+from .morphology import Morphology
+from .stats import G2pStats
 from .text_processor import TextProcessor
 
+if TYPE_CHECKING:
+    from .bert import BERT
+    from .lexicon import expand_lexicon, write_lexicon
+    from .lstm import LSTM
+    from .onnx_utils import WrapInferenceSession
+
+# these import ONNX Runtime, so they are only imported on first access, see `G2p(model_type="RULES")`
+_LAZY_ATTRIBUTES = {
+    "BERT": ".bert",
+    "LSTM": ".lstm",
+    "WrapInferenceSession": ".onnx_utils",
+    "expand_lexicon": ".lexicon",
+    "write_lexicon": ".lexicon",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+
+
 __version__ = "0.4.2"
-__all__ = ["G2p", "LSTM", "BERT", "WrapInferenceSession", "TextProcessor"]
+__all__ = [
+    "G2p",
+    "PhonemeIds",
+    "LSTM",
+    "BERT",
+    "WrapInferenceSession",
+    "TextProcessor",
+    "Morphology",
+    "G2pStats",
+    "expand_lexicon",
+    "write_lexicon",
+]
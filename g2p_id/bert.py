@@ -16,11 +16,12 @@ limitations under the License.
 
 import json
 import os
+from typing import List
 
 import numpy as np
 import onnxruntime
 
-from g2p_id.onnx_utils import WrapInferenceSession
+from g2p_id.onnx_utils import WrapInferenceSession, predict_in_chunks
 
 model_path = os.path.join(os.path.dirname(__file__), "models", "bert")
 
@@ -51,30 +52,59 @@ class BERT:
         Returns:
             str: Word after prediction.
         """
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts: List[str]) -> List[str]:
+        """Performs batched BERT inference, predicting the correct phoneme for the letter `e`.
+        Words without `e` are returned as is, and words longer than `max_seq_length` are predicted in chunks.
+
+        Args:
+            texts (List[str]): Words to predict from.
+
+        Returns:
+            List[str]: Words after prediction.
+        """
         # `x` is currently OOV, we replace with
-        text = text.replace("x", "ks")
-        # mask `e`'s
-        text = " ".join([c if c != "e" else "[mask]" for c in text])
+        texts = [text.replace("x", "ks") for text in texts]
+        return predict_in_chunks(texts, self.config["max_seq_length"], self._predict_masked)
 
-        # tokenize and pad to max length
-        tokens = [self.token2id[c] for c in text.split()]
-        padding = [self.token2id[self.config["pad_token"]] for _ in range(self.config["max_seq_length"] - len(tokens))]
-        tokens = tokens + padding
+    def _predict_masked(self, texts: List[str]) -> List[str]:
+        """Runs BERT on the words which contain `e`, all of at most `max_seq_length` characters.
 
-        input_ids = np.array([tokens], dtype="int64")
+        Args:
+            texts (List[str]): Words to predict from.
+
+        Returns:
+            List[str]: Words after prediction.
+        """
+        rows = [row for row, text in enumerate(texts) if "e" in text]
+        if not rows:
+            return texts
+
+        batch = []
+        for text in (texts[row] for row in rows):
+            # mask `e`'s
+            text = " ".join([c if c != "e" else "[mask]" for c in text])
+
+            # tokenize and pad to max length
+            tokens = [self.token2id[c] for c in text.split()]
+            padding = [
+                self.token2id[self.config["pad_token"]] for _ in range(self.config["max_seq_length"] - len(tokens))
+            ]
+            batch.append(tokens + padding)
+
+        input_ids = np.array(batch, dtype="int64")
         inputs = {"input_1": input_ids}
         prediction = self.model.run(None, inputs)
 
-        # find masked idx token
+        # find masked idx tokens
         mask_token_id = self.token2id[self.config["mask_token"]]
-        masked_index = np.where(input_ids == mask_token_id)[1]
-
-        # get prediction at masked indices
-        mask_prediction = prediction[0][0][masked_index]
-        predicted_ids = np.argmax(mask_prediction, axis=1)
+        masked_rows, masked_index = np.where(input_ids == mask_token_id)
 
-        # replace mask with predicted token
-        for i, idx in enumerate(masked_index):
-            tokens[idx] = predicted_ids[i]
+        # replace masks with predicted tokens
+        input_ids[masked_rows, masked_index] = np.argmax(prediction[0][masked_rows, masked_index], axis=-1)
 
-        return "".join([self.id2token[t] for t in tokens if t != 0])
+        predictions = list(texts)
+        for row, tokens in zip(rows, input_ids.tolist()):
+            predictions[row] = "".join([self.id2token[t] for t in tokens if t != 0])
+        return predictions
@@ -14,25 +14,88 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import copy
+import gc
 import os
 import re
 import pickle
+import threading
 import unicodedata
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from types import MappingProxyType
 from builtins import str as unicode
-from itertools import permutations
-from typing import Dict, List, Tuple, Union
+from itertools import islice, permutations
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import nltk
+import numpy as np
 from nltk.tag.perceptron import PerceptronTagger
 from nltk.tokenize import TweetTokenizer
 
-from g2p_id.bert import BERT
-from g2p_id.lstm import LSTM
+from g2p_id.morphology import Morphology
+from g2p_id.registry import load_shared, store_shared
+from g2p_id.stats import G2pStats
 from g2p_id.text_processor import TextProcessor
 
+if TYPE_CHECKING:
+    from g2p_id.bert import BERT
+    from g2p_id.lstm import LSTM
+
 nltk.download("wordnet")
 resources_path = os.path.join(os.path.dirname(__file__), "resources")
 
+# `TweetTokenizer` rules that can still match once `G2p._preprocess` only kept `[ a-z'.,?!-]`:
+# words with apostrophes or dashes, plain words, ellipsis dots and any other single character.
+# Unlike `TweetTokenizer`, dotted words which look like domain names (e.g. `bola.id`) are split.
+REPEATED_CHARS_RE = re.compile(r"([^a-z0-9])\1{3,}")
+WORDS_RE = re.compile(r"[a-z][a-z'\-]+[a-z]|[a-z]+|\.(?:\s*\.)+|\S")
+E_PHONEMES_RE = re.compile("[eə]")
+
+ALLOWED_CHARACTERS = frozenset(" abcdefghijklmnopqrstuvwxyz'.,?!-")
+
+
+class TranslationTable(dict):
+    """`str.translate` table which computes, then caches, the mapping of every codepoint on first use."""
+
+    def __init__(self, function: Callable[[str], str]):
+        super().__init__()
+        self.function = function
+
+    def __missing__(self, codepoint: int) -> str:
+        translation = self.function(chr(codepoint))
+        self[codepoint] = translation
+        return translation
+
+
+def strip_accents(char: str) -> str:
+    """Decomposes a character (NFD) and drops its nonspacing marks, e.g. `"é"` -> `"e"`."""
+    return "".join(c for c in unicodedata.normalize("NFD", char) if unicodedata.category(c) != "Mn")
+
+
+def lower_and_filter(char: str) -> str:
+    """Lower cases a character and drops it unless in `ALLOWED_CHARACTERS`."""
+    return "".join(c for c in char.lower() if c in ALLOWED_CHARACTERS)
+
+
+ACCENTS_TABLE = TranslationTable(strip_accents)
+CHARACTERS_TABLE = TranslationTable(lower_and_filter)
+
 
 def construct_homographs_dictionary() -> Dict[str, Tuple[str, str, str, str]]:
     """Creates a dictionary of homographs
@@ -53,15 +116,20 @@ def construct_homographs_dictionary() -> Dict[str, Tuple[str, str, str, str]]:
     return homograph2features
 
 
-def construct_lexicon_dictionary() -> Dict[str, str]:
+def construct_lexicon_dictionary(lexicon_path: Optional[str] = None) -> Dict[str, str]:
     """Creates a lexicon dictionary.
 
+    Args:
+        lexicon_path (str, optional):
+            Path to a `WORD<TAB>PHONEMES` TSV file. Defaults to the built-in `lexicon_id.tsv`.
+
     Returns:
         Dict[str, str]:
             Key: WORD
             Value: Phoneme (IPA)
     """
-    lexicon_path = os.path.join(resources_path, "lexicon_id.tsv")
+    if lexicon_path is None:
+        lexicon_path = os.path.join(resources_path, "lexicon_id.tsv")
     lexicon2features = {}
     with open(lexicon_path, encoding="utf-8") as file:
         lines = file.readlines()
@@ -71,6 +139,166 @@ def construct_lexicon_dictionary() -> Dict[str, str]:
     return lexicon2features
 
 
+def construct_tagger() -> PerceptronTagger:
+    """Loads the Indonesian POS tagger.
+
+    Returns:
+        PerceptronTagger: Trained POS tagger.
+    """
+    tagger = PerceptronTagger(load=False)
+    tagger_path = os.path.join(resources_path, "id_posp_tagger.pickle")
+    with open(tagger_path, "rb") as f:
+        return tagger.decode_json_obj(pickle.load(f))
+
+
+def construct_model(model_type: str) -> Union["BERT", "LSTM"]:
+    """Loads a neural network. ONNX Runtime is only imported here, so that `G2p(model_type="RULES")` never loads it.
+
+    Args:
+        model_type (str): "BERT", or "LSTM" for any other value.
+
+    Returns:
+        Union[BERT, LSTM]: Neural network.
+    """
+    # pylint: disable=import-outside-toplevel
+    if model_type == "BERT":
+        from g2p_id.bert import BERT
+
+        return BERT()
+
+    from g2p_id.lstm import LSTM
+
+    return LSTM()
+
+
+def construct_e_contexts(lexicon: Mapping[str, str]) -> Dict[str, str]:
+    """Learns the most frequent pronunciation of the letter `e`, either `e` or `ə`, in every letter context
+    of the lexicon, for `G2p(model_type="RULES")`. See `e_context_keys` for the contexts.
+
+    Args:
+        lexicon (Mapping[str, str]): Lexicon to learn from.
+
+    Returns:
+        Dict[str, str]:
+            Key: Letter context, seen at least 3 times
+            Value: `e` or `ə`
+    """
+    counts: Dict[str, List[int]] = {}
+    for word, pron in lexicon.items():
+        if "e" not in word:
+            continue
+        vowels = E_PHONEMES_RE.findall(pron)
+        if len(vowels) != word.count("e"):  # e.g. loanwords, where other letters are pronounced `e` or `ə`
+            continue
+        padded = f"^{word}$"
+        index = 0
+        for vowel in vowels:
+            index = padded.index("e", index + 1)
+            for key in e_context_keys(padded, index):
+                entry = counts.setdefault(key, [0, 0])
+                entry[vowel == "ə"] += 1
+    return {key: "ə" if schwas >= es else "e" for key, (es, schwas) in counts.items() if es + schwas >= 3}
+
+
+def e_context_keys(padded: str, index: int) -> Tuple[str, str, str]:
+    """Lists the letter contexts of an `e`, from the most to the least specific:
+    one letter to its left and two to its right, one letter to either side, and one letter to its right.
+
+    Args:
+        padded (str): Word with `^` and `$` boundary markers.
+        index (int): Index of an `e` in `padded`.
+
+    Returns:
+        Tuple[str, str, str]: Context keys.
+    """
+    return padded[index - 1 : index + 3], padded[index - 1 : index + 2], padded[index : index + 2]
+
+
+# maximum number of words per background refinement batch of `G2p(model_type="RULES", refine=True)`
+REFINE_BATCH_SIZE = 64
+
+# `G2p.save_snapshot` file format, bumped on incompatible changes
+SNAPSHOT_FORMAT = "g2p_id-snapshot"
+SNAPSHOT_VERSION = 1
+
+
+def segment_phonemes(pron: str) -> str:
+    """Splits an unsegmented phoneme string, e.g. from `LSTM.predict`, into space-separated phonemes.
+
+    Args:
+        pron (str): Phoneme string.
+
+    Returns:
+        str: Space-separated phonemes.
+    """
+    phonemes = [list(phn) if phn not in ("dʒ", "tʃ") else [phn] for phn in re.split("(tʃ|dʒ)", pron)]
+    return " ".join([p for phn in phonemes for p in phn])
+
+
+def bounded_insert(cache: Dict[Any, Any], maxsize: int, key: Any, value: Any):
+    """Inserts into a size-bounded cache, evicting the oldest entry when full.
+
+    Args:
+        cache (Dict[Any, Any]): Cache to insert into.
+        maxsize (int): Maximum number of entries. Nothing is inserted if not positive.
+        key (Any): Cache key.
+        value (Any): Cache value.
+    """
+    if maxsize <= 0:
+        return
+    if key not in cache and len(cache) >= maxsize:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+# phonemes, followed by punctuations kept by `G2p._preprocess`
+PHONEME_INVENTORY = tuple(
+    ["a", "b", "d", "e", "f", "ɡ", "h", "i", "j", "k", "l", "m", "n", "o", "p", "r", "s", "t", "u", "v", "w", "z"]
+    + ["ŋ", "ə", "ɲ", "tʃ", "ʃ", "dʒ", "x", "ʔ"]
+    + [".", ",", "?", "!", "'", "-"]
+)
+
+
+class PhonemeVocabulary(dict):
+    """Phoneme to ID mapping, starting from `PHONEME_INVENTORY`.
+    Unexpected symbols, e.g. from neural network predictions, are appended with the next free ID.
+    """
+
+    def __init__(self, inventory: Sequence[str] = PHONEME_INVENTORY):
+        super().__init__((phoneme, idx) for idx, phoneme in enumerate(inventory))
+        self.inventory = list(inventory)
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"inventory": self.inventory}
+
+    def __setstate__(self, state):
+        self.inventory = state["inventory"]
+        self.lock = threading.Lock()
+
+    def __missing__(self, phoneme: str) -> int:
+        with self.lock:
+            if phoneme not in self:
+                self.inventory.append(phoneme)
+                self[phoneme] = len(self.inventory) - 1
+            return self[phoneme]
+
+
+class PhonemeIds(NamedTuple):
+    """Compact G2p output, laid out like a CSR matrix of words by phonemes.
+    Being plain NumPy arrays, it can be pickled or sent as raw buffers between processes cheaply.
+
+    Attributes:
+        inventory (Tuple[str, ...]): Phoneme of every ID.
+        ids (np.ndarray): Flat `int16` array of phoneme IDs of all words.
+        offsets (np.ndarray): `int32` array of `len(words) + 1` start offsets of every word in `ids`.
+    """
+
+    inventory: Tuple[str, ...]
+    ids: np.ndarray
+    offsets: np.ndarray
+
+
 class G2p:
     """Grapheme-to-phoneme (g2p) main class for phonemization.
     This class provides a high-level API for grapheme-to-phoneme conversion.
@@ -81,26 +309,106 @@ class G2p:
     4. If word is non-alphabetic, add to list (i.e. punctuation)
     5. If word is a homograph, check POS and use matching word's phonemes
     6. If word is a non-homograph, lookup lexicon
-    7. Otherwise, predict with a neural network
+    7. If word is an affixed form of a lexicon word, compose its phonemes
+    8. Otherwise, predict with a neural network, or with rules if `model_type` is "RULES"
+
+    Lexicons, the normalizer, the POS tagger and neural networks are loaded once per process
+    and shared by all instances, see `g2p_id.registry`. Lexicons are therefore read-only mappings,
+    override pronunciations per instance with `user_lexicon` instead.
+
+    Instances are thread-safe: one instance can be shared by many threads, see `map_threads`.
     """
 
-    def __init__(self, model_type="BERT"):
+    def __init__(
+        self,
+        model_type="BERT",
+        *,
+        stats: Optional[G2pStats] = None,
+        word_cache_size: int = 10000,
+        sentence_cache_size: int = 0,
+        user_lexicon: Optional[str] = None,
+        morphology: bool = True,
+        refine: bool = False,
+    ):
         """Constructor for G2p.
 
         Args:
             model_type (str, optional):
                 Type of neural network to use for prediction.
                 Choices are "LSTM" or "BERT". Defaults to "BERT".
+                "RULES" predicts with letter rules and a lexicon-based heuristic for `e` instead,
+                and never loads ONNX Runtime, for the fastest startup and bounded latency.
+            stats (G2pStats, optional):
+                Collector of per-stage timings and counters. Can also be attached later
+                by setting `stats`. Disabled by default.
+            word_cache_size (int, optional):
+                Maximum number of non-homograph words whose final phonemes are cached.
+                Set to 0 to disable the cache. Defaults to 10000.
+            sentence_cache_size (int, optional):
+                Maximum number of raw input texts whose results are cached, skipping the whole pipeline
+                for repeated inputs. Defaults to 0 (disabled).
+            user_lexicon (str, optional):
+                Path to an additional lexicon TSV, e.g. built with `g2p_id.lexicon.expand_lexicon`.
+                Its entries take precedence over the built-in lexicon. Defaults to None.
+            morphology (bool, optional):
+                Whether to compose pronunciations of OOV words from affixes and a lexicon root,
+                before falling back to the neural network. Defaults to True.
+            refine (bool, optional):
+                Only for "RULES": queues words predicted with rules for BERT prediction in a background
+                thread, whose phonemes then replace the rule-based ones in the word cache. See `wait_for_refinement`.
+                Texts with words still to be refined are not added to the sentence cache. Defaults to False.
+
+        Raises:
+            ValueError: If `refine` is set for "RULES" without a word cache to store refined phonemes in.
         """
-        self.homograph2features = construct_homographs_dictionary()
-        self.lexicon2features = construct_lexicon_dictionary()
-        self.normalizer = TextProcessor()
-        self.tagger = PerceptronTagger(load=False)
-        tagger_path = os.path.join(resources_path, "id_posp_tagger.pickle")
-        with open(tagger_path, "rb") as f:
-            self.tagger = self.tagger.decode_json_obj(pickle.load(f))
-        self.model: Union[BERT, LSTM] = BERT() if model_type == "BERT" else LSTM()
+        if model_type == "RULES" and refine and word_cache_size <= 0:
+            raise ValueError("refine=True needs a word cache to store refined phonemes in, set word_cache_size > 0.")
+        self.stats = stats
+        self.word_cache_size = word_cache_size
+        self._word_cache: Dict[str, Tuple[str, ...]] = {}
+        self.sentence_cache_size = sentence_cache_size
+        self._sentence_cache: Dict[str, Tuple[Tuple[str, ...], ...]] = {}
+        self._sentence_cache_hits = 0
+        self._sentence_cache_misses = 0
+        self._lock = threading.Lock()
+        self._refined = threading.Condition(self._lock)
+        self._refine_pending: Dict[str, None] = {}
+        self._refiner: Optional[threading.Thread] = None
+        self._refinement_model: Optional["BERT"] = None
+        # immutable resources are loaded once per process, and shared by all instances as read-only mappings
+        self.homograph2features: Mapping[str, Tuple[str, str, str, str]] = load_shared(
+            "homographs", lambda: MappingProxyType(construct_homographs_dictionary())
+        )
+        self.user_lexicon = user_lexicon
+        self._lexicon_key: Hashable = "lexicon"
+        self.lexicon2features: Mapping[str, str] = load_shared(
+            "lexicon", lambda: MappingProxyType(construct_lexicon_dictionary())
+        )
+        if user_lexicon is not None:
+            self.user_lexicon = os.path.abspath(user_lexicon)
+            self._lexicon_key = ("lexicon", self.user_lexicon)
+            lexicon = self.lexicon2features
+            self.lexicon2features = load_shared(
+                self._lexicon_key,
+                lambda: MappingProxyType({**lexicon, **construct_lexicon_dictionary(user_lexicon)}),
+            )
+        self.morphology = Morphology(self.lexicon2features) if morphology else None
+        self.model_type = model_type
+        self.model: Optional[Union["BERT", "LSTM"]] = None
+        self.e_contexts: Mapping[str, str] = MappingProxyType({})
+        if model_type == "RULES":
+            lexicon = self.lexicon2features
+            self.e_contexts = load_shared(
+                ("e_contexts", self._lexicon_key), lambda: MappingProxyType(construct_e_contexts(lexicon))
+            )
+        else:
+            self.model = load_shared(("model", model_type), lambda: construct_model(model_type))
+        self.refine = refine and self.model is None
+        self.normalizer = load_shared("normalizer", TextProcessor)
+        self.tagger = load_shared("tagger", construct_tagger)
         self.tokenizer = TweetTokenizer()
+        self.phoneme2id = PhonemeVocabulary()
+        self._fork_hook_registered = False
         self.pos_dict = {
             "N": ["B-NNO", "B-NNP", "B-PRN", "B-PRN", "B-PRK"],
             "V": ["B-VBI", "B-VBT", "B-VBP", "B-VBL", "B-VBE"],
@@ -108,7 +416,170 @@ class G2p:
             "P": ["B-PAR"],
         }
 
-    def _preprocess(self, text: str) -> str:
+    def reload_sessions(self):
+        """Recreates the ONNX Runtime sessions of the neural networks, e.g. in a forked worker process."""
+        models = [model for model in (self.model, self._refinement_model) if model is not None]
+        if not models:
+            return
+
+        from g2p_id.onnx_utils import WrapInferenceSession  # pylint: disable=import-outside-toplevel
+
+        for model in models:
+            for attribute in vars(model).values():
+                if isinstance(attribute, WrapInferenceSession):
+                    attribute.reload()
+
+    def _after_fork_in_child(self):
+        """Resets state which doesn't survive a fork."""
+        # locks may have been held by other threads of the parent at fork time
+        self._lock = threading.Lock()
+        self._refined = threading.Condition(self._lock)
+        self.phoneme2id.lock = threading.Lock()
+        if self.stats is not None:
+            self.stats.reset_lock()
+        # the background refinement thread doesn't exist in the child
+        self._refine_pending = {}
+        self._refiner = None
+        self.reload_sessions()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # locks and the background refinement thread can't be pickled, pending words are not refined in the copy
+        for name in ("_lock", "_refined", "_refiner", "_refine_pending"):
+            del state[name]
+        # read-only mappings can't be pickled either, the morphology refers to the lexicon and is recreated
+        for name in ("homograph2features", "lexicon2features", "e_contexts"):
+            state[name] = dict(state[name])
+        state["morphology"] = self.morphology is not None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in ("homograph2features", "lexicon2features", "e_contexts"):
+            setattr(self, name, MappingProxyType(state[name]))
+        self.morphology = Morphology(self.lexicon2features) if state["morphology"] else None
+        self._lock = threading.Lock()
+        self._refined = threading.Condition(self._lock)
+        self._refine_pending = {}
+        self._refiner = None
+        # the fork hook is registered for the pickled instance only
+        self._fork_hook_registered = False
+
+    def prepare_for_fork(self):
+        """Prepares this instance to be created once in a parent process and shared with forked workers,
+        e.g. a gunicorn master with `preload_app`, or `multiprocessing` with the fork start method.
+
+        - Moves all objects tracked by the garbage collector, including the lexicons, tagger weights
+          and normalizer tables, to a permanent generation, so that collections in workers don't write
+          to, and thereby copy, their memory pages.
+        - Recreates the ONNX Runtime sessions in every forked child, as they are not fork-safe.
+
+        Call this right before forking. For the most sharing, also call `gc.disable()` before creating
+        `G2p` in the parent, and `gc.enable()` early in every worker.
+        """
+        if not self._fork_hook_registered and hasattr(os, "register_at_fork"):
+            after_fork = weakref.WeakMethod(self._after_fork_in_child)
+
+            def reload_in_child():
+                method = after_fork()
+                if method is not None:
+                    method()
+
+            os.register_at_fork(after_in_child=reload_in_child)
+            self._fork_hook_registered = True
+        gc.freeze()
+
+    def save_snapshot(self, path: str):
+        """Saves the configuration and fully initialized resources of this instance to a single file, from which
+        `load_snapshot` creates an equivalent instance without parsing the lexicons, homographs and tagger,
+        nor optimizing the ONNX models, e.g. to shorten serverless cold starts.
+
+        Snapshots are pickles, so only load trusted ones. ONNX models are stored after graph optimizations, so
+        snapshots are versioned, and should be loaded with the same ONNX Runtime version,
+        on the same kind of hardware they were saved on.
+
+        Args:
+            path (str): Output path.
+        """
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "onnxruntime": None,
+            "config": {
+                "model_type": self.model_type,
+                "word_cache_size": self.word_cache_size,
+                "sentence_cache_size": self.sentence_cache_size,
+                "user_lexicon": self.user_lexicon,
+                "morphology": self.morphology is not None,
+                "refine": self.refine,
+            },
+        }
+        # stored under their `load_shared` keys, read-only mappings as dicts, which unlike them can be pickled
+        resources: Dict[Hashable, Any] = {
+            "homographs": dict(self.homograph2features),
+            self._lexicon_key: dict(self.lexicon2features),
+            "normalizer": self.normalizer,
+            "tagger": self.tagger,
+        }
+        if self.model is None:
+            resources[("e_contexts", self._lexicon_key)] = dict(self.e_contexts)
+        else:
+            # pylint: disable=import-outside-toplevel
+            import onnxruntime
+
+            from g2p_id.onnx_utils import WrapInferenceSession
+
+            model = copy.copy(self.model)
+            for name, attribute in list(vars(model).items()):
+                if isinstance(attribute, WrapInferenceSession):
+                    setattr(model, name, attribute.optimize())
+            resources[("model", self.model_type)] = model
+            header["onnxruntime"] = onnxruntime.__version__
+
+        with open(path, "wb") as file:
+            pickle.dump(header, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(resources, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load_snapshot(cls, path: str, stats: Optional[G2pStats] = None) -> "G2p":
+        """Creates an instance from a file saved with `save_snapshot`. Its resources are shared with
+        instances created later in this process, unless these were already loaded.
+
+        Args:
+            path (str): Snapshot path.
+            stats (G2pStats, optional): Collector of per-stage timings and counters. Defaults to None.
+
+        Returns:
+            G2p: Instance equivalent to the saved one, with empty caches.
+
+        Raises:
+            ValueError: If `path` is not a snapshot, or was saved with another snapshot or ONNX Runtime version.
+        """
+        with open(path, "rb") as file:
+            header = pickle.load(file)
+            if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"{path} is not a G2p snapshot.")
+
+            expected = {"version": SNAPSHOT_VERSION}
+            if header["onnxruntime"] is not None:
+                import onnxruntime  # pylint: disable=import-outside-toplevel
+
+                expected["onnxruntime"] = onnxruntime.__version__
+            for name, version in expected.items():
+                if header[name] != version:
+                    raise ValueError(f"{path} was saved with {name} {header[name]}, but this is {version}.")
+
+            resources = pickle.load(file)
+
+        store_shared(
+            {
+                key: MappingProxyType(resource) if isinstance(resource, dict) else resource
+                for key, resource in resources.items()
+            }
+        )
+        return cls(stats=stats, **header["config"])
+
+    def _preprocess(self, text: str, timings: Optional[Dict[str, float]] = None) -> str:
         """Performs preprocessing.
         (1) Adds spaces in between tokens
         (2) Normalizes unicode and accents
@@ -118,6 +589,7 @@ class G2p:
 
         Arguments:
             text (str): Text to preprocess.
+            timings (Dict[str, float], optional): Per-stage timings to record into. Defaults to None.
 
         Returns:
             str: Preprocessed text.
@@ -126,10 +598,15 @@ class G2p:
         text = re.sub(r"\.(?=.*\.)", " ", text)
         text = " ".join(self.tokenizer.tokenize(text))
         text = unicode(text)
-        text = "".join(char for char in unicodedata.normalize("NFD", text) if unicodedata.category(char) != "Mn")
-        text = self.normalizer.normalize(text).strip()
-        text = text.lower()
-        text = re.sub(r"[^ a-z'.,?!\-]", "", text)
+        if not text.isascii():
+            text = text.translate(ACCENTS_TABLE)
+        if timings is None:
+            text = self.normalizer.normalize(text).strip()
+        else:
+            start = perf_counter()
+            text = self.normalizer.normalize(text).strip()
+            timings["normalize"] += perf_counter() - start
+        text = text.translate(CHARACTERS_TABLE)
         return text
 
     def _rule_based_g2p(self, text: str) -> str:
@@ -169,8 +646,250 @@ class G2p:
         for graph, phone in phonetic_mapping.items():
             text = text.replace(graph, phone)
 
-        phonemes = [list(phn) if phn not in ("dʒ", "tʃ") else [phn] for phn in re.split("(tʃ|dʒ)", text)]
-        return " ".join([p for phn in phonemes for p in phn])
+        return segment_phonemes(text)
+
+    def _rule_based_e(self, word: str) -> str:
+        """Predicts the pronunciation of every letter `e`, like `BERT.predict`, from the most frequent
+        pronunciation in its most specific letter context seen in the lexicon. Unseen contexts default to `ə`.
+
+        Args:
+            word (str): Word to predict from.
+
+        Returns:
+            str: Word with `e`'s pronounced `ə` replaced.
+        """
+        if "e" not in word:
+            return word
+
+        padded = f"^{word}$"
+        letters = list(word)
+        for index, letter in enumerate(letters):
+            if letter == "e":
+                keys = e_context_keys(padded, index + 1)
+                letters[index] = next((self.e_contexts[key] for key in keys if key in self.e_contexts), "ə")
+        return "".join(letters)
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        """Word tokenizes preprocessed text.
+
+        Args:
+            text (str): Text from `_preprocess`.
+
+        Returns:
+            List[str]: List of words and punctuations.
+        """
+        return WORDS_RE.findall(REPEATED_CHARS_RE.sub(r"\1\1\1", text))
+
+    def _tag(self, text: str, timings: Optional[Dict[str, float]] = None) -> List[Tuple[str, str]]:
+        """Preprocesses, word tokenizes and POS tags text.
+
+        Args:
+            text (str): Text to tag.
+            timings (Dict[str, float], optional): Per-stage timings to record into. Defaults to None.
+
+        Returns:
+            List[Tuple[str, str]]: List of (word, POS) pairs.
+        """
+        if timings is None:
+            return self.tagger.tag(self._tokenize(self._preprocess(text)))
+
+        start = perf_counter()
+        text = self._preprocess(text, timings)
+        timings["preprocess"] = perf_counter() - start - timings["normalize"]
+        start = perf_counter()
+        words = self._tokenize(text)
+        timings["tokenize"] = perf_counter() - start
+        start = perf_counter()
+        tokens = self.tagger.tag(words)
+        timings["tag"] = perf_counter() - start
+        return tokens
+
+    def _lookup(self, word: str, pos: str, timings: Optional[Dict[str, float]] = None) -> Tuple[str, str]:
+        """Finds the phonemes of a single word, from punctuation, homographs, lexicon or neural network.
+
+        Args:
+            word (str): Preprocessed word.
+            pos (str): POS tag of `word`.
+            timings (Dict[str, float], optional): Per-stage timings to record into. Defaults to None.
+
+        Returns:
+            Tuple[str, str]: Phoneme string, and its source as a `G2pStats` counter name.
+        """
+        pron = ""
+        if re.search("[a-z]", word) is None:  # non-alphabetic
+            pron = word
+            source = "non_alphabetic"
+
+        elif word in self.homograph2features:  # check if homograph
+            pron1, pron2, pos1, _ = self.homograph2features[word]
+
+            # check for the matching POS
+            if pos in self.pos_dict[pos1]:
+                pron = pron1
+            else:
+                pron = pron2
+            source = "homograph_hits"
+
+        elif word in self.lexicon2features:  # non-homographs
+            pron = self.lexicon2features[word]
+            source = "lexicon_hits"
+
+        elif self.morphology is not None and (decomposed := self.morphology.decompose(word)) is not None:
+            pron = decomposed  # affixed lexicon words
+            source = "morphology_hits"
+
+        else:  # predict for OOV
+            pron = self._predict(word, timings)
+            source = "oov_predictions"
+
+        return pron, source
+
+    def _predict(self, word: str, timings: Optional[Dict[str, float]] = None) -> str:
+        """Predicts the phonemes of an OOV word with the neural network, or with rules if there is none.
+
+        Args:
+            word (str): Word to predict.
+            timings (Dict[str, float], optional): Per-stage timings to record into. Defaults to None.
+
+        Returns:
+            str: Phoneme string.
+        """
+        if timings is not None:
+            start = perf_counter()
+        if self.model is None:
+            pron = self._rule_based_g2p(self._rule_based_e(word))
+        else:
+            pron = self.model.predict(word)
+            if self.model_type == "BERT":
+                pron = self._rule_based_g2p(pron)
+            else:  # LSTM predictions are unsegmented
+                pron = segment_phonemes(pron)
+        if timings is not None:
+            timings["predict"] += perf_counter() - start
+        return pron
+
+    @staticmethod
+    def _postprocess(pron: str) -> Tuple[str, ...]:
+        """Fixes glottal stops and splits a phoneme string into phonemes.
+
+        Args:
+            pron (str): Phoneme string.
+
+        Returns:
+            Tuple[str, ...]: Phonemes.
+        """
+        if pron.endswith("ʔ"):
+            pron = pron[:-1] + "k"
+
+        consonants = "bdjklmnprstwɲ"
+        vowels = "aeiouə"
+
+        for letter in consonants:
+            pron = pron.replace(f"ʔ {letter}", f"k {letter}")
+
+        # add a glottal stop in between consecutive vowels
+        for v1, v2 in permutations(vowels, 2):
+            pron = pron.replace(f"{v1} {v2}", f"{v1} ʔ {v2}")
+
+        return tuple(pron.split())
+
+    def _cache_word(self, word: str, phonemes: Tuple[str, ...]):
+        """Caches the final phonemes of a non-homograph word, evicting the oldest entry when full.
+
+        Args:
+            word (str): Preprocessed word.
+            phonemes (Tuple[str, ...]): Final phonemes of `word`.
+        """
+        with self._lock:
+            bounded_insert(self._word_cache, self.word_cache_size, word, phonemes)
+
+    def _queue_refinement(self, word: str):
+        """Queues a word predicted with rules for background BERT prediction, starting the refinement thread if needed.
+
+        Args:
+            word (str): Preprocessed word.
+        """
+        with self._lock:
+            if word in self._refine_pending:
+                return
+            self._refine_pending[word] = None
+            if self._refiner is None:
+                self._refiner = threading.Thread(target=self._refine_in_background, name="g2p-refine", daemon=True)
+                self._refiner.start()
+
+    def _refine_in_background(self):
+        """Predicts queued words with BERT in batches, until none are left, and caches their phonemes."""
+        try:
+            while self._refine_next_batch():
+                pass
+        finally:
+            with self._refined:
+                if self._refiner is threading.current_thread():  # only on errors
+                    self._refiner = None
+                self._refined.notify_all()
+
+    def _refine_next_batch(self) -> bool:
+        """Predicts the oldest queued words with BERT and caches their phonemes.
+
+        Returns:
+            bool: Whether there were any queued words. If not, the refinement thread must stop.
+        """
+        with self._lock:
+            words = list(islice(self._refine_pending, REFINE_BATCH_SIZE))
+            if not words:
+                self._refiner = None
+                return False
+
+        refined = {}
+        try:
+            if self._refinement_model is None:
+                self._refinement_model = load_shared(("model", "BERT"), lambda: construct_model("BERT"))
+            for word, pron in zip(words, self._refinement_model.predict_batch(words)):
+                refined[word] = self._postprocess(self._rule_based_g2p(pron))
+        finally:
+            with self._refined:
+                for word in words:
+                    del self._refine_pending[word]
+                    if word in refined:
+                        bounded_insert(self._word_cache, self.word_cache_size, word, refined[word])
+                self._refined.notify_all()
+        return True
+
+    def wait_for_refinement(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all words queued for background refinement are refined, see `refine`.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to None (no limit).
+
+        Returns:
+            bool: Whether no words are left to refine.
+        """
+        with self._refined:
+            self._refined.wait_for(lambda: not self._refine_pending or self._refiner is None, timeout)
+            return not self._refine_pending
+
+    def cache_info(self) -> Dict[str, int]:
+        """Reports sentence cache statistics.
+
+        Returns:
+            Dict[str, int]: Sentence cache `hits`, `misses`, current `size` and `maxsize`.
+        """
+        with self._lock:
+            return {
+                "hits": self._sentence_cache_hits,
+                "misses": self._sentence_cache_misses,
+                "size": len(self._sentence_cache),
+                "maxsize": self.sentence_cache_size,
+            }
+
+    def clear_cache(self):
+        """Clears cached word and sentence phonemes, and resets sentence cache statistics."""
+        with self._lock:
+            self._word_cache.clear()
+            self._sentence_cache.clear()
+            self._sentence_cache_hits = 0
+            self._sentence_cache_misses = 0
 
     def __call__(self, text: str) -> List[List[str]]:
         """Grapheme-to-phoneme converter.
@@ -181,7 +900,11 @@ class G2p:
         4. If word is non-alphabetic, add to list (i.e. punctuation)
         5. If word is a homograph, check POS and use matching word's phonemes
         6. If word is a non-homograph, lookup lexicon
-        7. Otherwise, predict with a neural network
+        7. If word is an affixed form of a lexicon word, compose its phonemes
+        8. Otherwise, predict with a neural network
+
+        Final phonemes of non-homographs are cached per word, so repeated words skip steps 4-8.
+        If `sentence_cache_size` is set, repeated input texts skip all steps.
 
         Args:
             text (str): Grapheme text to convert to phoneme.
@@ -189,46 +912,119 @@ class G2p:
         Returns:
             List[List[str]]: List of strings in phonemes.
         """
-        text = self._preprocess(text)
-        words = self.tokenizer.tokenize(text)
-        tokens = self.tagger.tag(words)
+        return [list(phonemes) for phonemes in self._phonemes(text)]
 
-        prons = []
-        for word, pos in tokens:
-            pron = ""
-            if re.search("[a-z]", word) is None:  # non-alphabetic
-                pron = word
+    def map_threads(self, texts: Iterable[str], max_workers: Optional[int] = None) -> List[List[List[str]]]:
+        """Converts many texts concurrently on a thread pool, sharing this instance and its model.
+        ONNX Runtime releases the GIL during inference, so preprocessing of some texts overlaps
+        with neural network predictions of others.
 
-            elif word in self.homograph2features:  # check if homograph
-                pron1, pron2, pos1, _ = self.homograph2features[word]
+        Args:
+            texts (Iterable[str]): Grapheme texts to convert to phoneme.
+            max_workers (int, optional): Number of threads. Defaults to `ThreadPoolExecutor`'s default.
 
-                # check for the matching POS
-                if pos in self.pos_dict[pos1]:
-                    pron = pron1
-                else:
-                    pron = pron2
+        Returns:
+            List[List[List[str]]]: Phonemes of every text, in the order of `texts`.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self, texts))
 
-            elif word in self.lexicon2features:  # non-homographs
-                pron = self.lexicon2features[word]
+    def to_ids(self, text: str) -> PhonemeIds:
+        """Grapheme-to-phoneme converter, returning phoneme IDs in a flat array instead of nested lists.
+        The phonemes of word `i` are `inventory[ids[offsets[i] : offsets[i + 1]]]`.
 
-            else:  # predict for OOV
-                pron = self.model.predict(word)
-                if isinstance(self.model, BERT):
-                    pron = self._rule_based_g2p(pron)
+        Args:
+            text (str): Grapheme text to convert to phoneme.
 
-            if pron.endswith("ʔ"):
-                pron = pron[:-1] + "k"
+        Returns:
+            PhonemeIds: Phoneme inventory, phoneme IDs and word offsets.
+        """
+        prons = self._phonemes(text)
+        phoneme2id = self.phoneme2id
+        offsets = np.zeros(len(prons) + 1, dtype=np.int32)
+        np.cumsum([len(phonemes) for phonemes in prons], out=offsets[1:])
+        ids = np.fromiter(
+            (phoneme2id[phoneme] for phonemes in prons for phoneme in phonemes),
+            dtype=np.int16,
+            count=int(offsets[-1]),
+        )
+        with phoneme2id.lock:
+            inventory = tuple(phoneme2id.inventory)
+        return PhonemeIds(inventory, ids, offsets)
 
-            consonants = "bdjklmnprstwɲ"
-            vowels = "aeiouə"
+    def _phonemes(self, text: str) -> Sequence[Tuple[str, ...]]:
+        """Converts text to phonemes through the sentence cache, if enabled.
 
-            for letter in consonants:
-                pron = pron.replace(f"ʔ {letter}", f"k {letter}")
+        Args:
+            text (str): Grapheme text to convert to phoneme.
 
-            # add a glottal stop in between consecutive vowels
-            for v1, v2 in permutations(vowels, 2):
-                pron = pron.replace(f"{v1} {v2}", f"{v1} ʔ {v2}")
+        Returns:
+            Sequence[Tuple[str, ...]]: Phonemes of every word.
+        """
+        if self.sentence_cache_size <= 0:
+            return self._phonemize(text)[0]
 
-            prons.append(pron.split())
+        cached = self._sentence_cache.get(text)
+        if cached is not None:
+            with self._lock:
+                self._sentence_cache_hits += 1
+            return cached
 
+        prons, refining = self._phonemize(text)
+        with self._lock:
+            self._sentence_cache_misses += 1
+            if not refining:  # otherwise, later calls must pick up the refined phonemes from the word cache
+                bounded_insert(self._sentence_cache, self.sentence_cache_size, text, tuple(prons))
         return prons
+
+    def _phonemize(self, text: str) -> Tuple[List[Tuple[str, ...]], bool]:
+        """Runs the full grapheme-to-phoneme pipeline, without the sentence cache.
+
+        Args:
+            text (str): Grapheme text to convert to phoneme.
+
+        Returns:
+            Tuple[List[Tuple[str, ...]], bool]:
+                Phonemes of every word, and whether any of them are rule-based ones still to be refined.
+        """
+        stats = self.stats
+        start = 0.0
+        if stats is None:
+            tokens = self._tag(text)
+        else:
+            timings, counters = stats.new_record()
+            tokens = self._tag(text, timings)
+            counters["words"] = len(tokens)
+            start = perf_counter()
+
+        word_cache = self._word_cache
+        prons = []
+        refining = False
+        for word, pos in tokens:
+            # checked before the word cache, as refined phonemes are cached before words stop being pending
+            if self.refine and word in self._refine_pending:
+                refining = True
+            cached = word_cache.get(word)
+            if cached is not None:  # previously seen non-homograph
+                prons.append(cached)
+                if stats is not None:
+                    counters["word_cache_hits"] += 1
+                continue
+
+            pron, source = self._lookup(word, pos, timings if stats is not None else None)
+            if stats is not None:
+                counters[source] += 1
+
+            phonemes = self._postprocess(pron)
+            if source != "homograph_hits":  # homographs depend on POS
+                self._cache_word(word, phonemes)
+            if source == "oov_predictions" and self.refine:  # only once cached, to be replaced
+                self._queue_refinement(word)
+                refining = True
+            prons.append(phonemes)
+
+        if stats is not None:
+            timings["lookup"] = perf_counter() - start - timings["predict"]
+            stats.update(timings, counters)
+
+        return prons, refining
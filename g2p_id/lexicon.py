@@ -0,0 +1,128 @@
+"""
+Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import re
+from typing import Dict, Iterable, List, Optional, Union, cast
+
+from g2p_id.bert import BERT
+from g2p_id.g2p import G2p, segment_phonemes
+from g2p_id.lstm import LSTM
+
+
+def collect_oov_words(g2p: G2p, texts: Iterable[str]) -> List[str]:
+    """Collects unique words of `texts` that `g2p` would send to its neural network,
+    i.e. neither homographs, lexicon words nor their affixed forms.
+    Words with characters the model cannot encode are skipped.
+
+    Args:
+        g2p (G2p): G2p instance whose preprocessing, homographs and lexicon are used.
+        texts (Iterable[str]): Words or texts to collect from.
+
+    Returns:
+        List[str]: Sorted unique OOV words.
+
+    Raises:
+        ValueError: If `g2p` has no neural network.
+    """
+    if g2p.model is None:
+        raise ValueError('Expanding a lexicon needs a neural network, not model_type="RULES".')
+    if isinstance(g2p.model, BERT):
+        vocab = set(g2p.model.token2id)
+    else:
+        vocab = set(g2p.model.g2id)
+
+    words = set()
+    for text in texts:
+        for word in g2p._tokenize(g2p._preprocess(text)):  # pylint: disable=protected-access
+            if re.search("[a-z]", word) is None or word in g2p.homograph2features or word in g2p.lexicon2features:
+                continue
+            if g2p.morphology is not None and g2p.morphology.decompose(word) is not None:
+                continue
+            graphemes = word.replace("x", "ks") if isinstance(g2p.model, BERT) else word
+            if set(graphemes) <= vocab:
+                words.add(word)
+    return sorted(words)
+
+
+def expand_lexicon(
+    texts: Iterable[str],
+    model_type: str = "BERT",
+    batch_size: int = 256,
+    g2p: Optional[G2p] = None,
+) -> Dict[str, str]:
+    """Predicts pronunciations of all OOV words of `texts` with batched neural network inference.
+    The result can be saved with `write_lexicon` and loaded with `G2p(user_lexicon=...)`,
+    so that these words become lexicon hits.
+
+    Args:
+        texts (Iterable[str]): Words or texts, e.g. all unique tokens of a corpus.
+        model_type (str, optional):
+            Type of neural network to use for prediction.
+            Choices are "LSTM" or "BERT". Defaults to "BERT".
+        batch_size (int, optional): Number of words per inference batch. Defaults to 256.
+        g2p (G2p, optional): G2p instance to use instead of creating one. Defaults to None.
+
+    Returns:
+        Dict[str, str]:
+            Key: WORD
+            Value: Phoneme (IPA)
+    """
+    if g2p is None:
+        g2p = G2p(model_type=model_type)
+
+    words = collect_oov_words(g2p, texts)
+    model = cast(Union[BERT, LSTM], g2p.model)  # not None, checked by `collect_oov_words`
+    lexicon = {}
+    for i in range(0, len(words), batch_size):
+        batch = words[i : i + batch_size]
+        for word, pron in zip(batch, model.predict_batch(batch)):
+            if isinstance(model, BERT):
+                lexicon[word] = g2p._rule_based_g2p(pron)  # pylint: disable=protected-access
+            else:
+                lexicon[word] = segment_phonemes(pron)
+    return lexicon
+
+
+def write_lexicon(lexicon: Dict[str, str], lexicon_path: str):
+    """Writes a lexicon to a `WORD<TAB>PHONEMES` TSV file, in the format of `lexicon_id.tsv`.
+
+    Args:
+        lexicon (Dict[str, str]): Lexicon to write.
+        lexicon_path (str): Output path.
+    """
+    with open(lexicon_path, "w", encoding="utf-8") as file:
+        for grapheme, phoneme in sorted(lexicon.items()):
+            file.write(f"{grapheme}\t{phoneme}\n")
+
+
+def main():
+    """Command-line entry point, e.g. `python -m g2p_id.lexicon corpus.txt lexicon_ext.tsv`."""
+    parser = argparse.ArgumentParser(description="Expands the G2p lexicon with neural network predictions.")
+    parser.add_argument("input_path", help="Text file of words or sentences, one per line.")
+    parser.add_argument("output_path", help="Output lexicon TSV file.")
+    parser.add_argument("--model_type", default="BERT", choices=["BERT", "LSTM"])
+    parser.add_argument("--batch_size", type=int, default=256)
+    args = parser.parse_args()
+
+    with open(args.input_path, encoding="utf-8") as file:
+        lexicon = expand_lexicon(file, model_type=args.model_type, batch_size=args.batch_size)
+    write_lexicon(lexicon, args.output_path)
+    print(f"Wrote {len(lexicon)} words to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,11 +16,12 @@ limitations under the License.
 
 import json
 import os
+from typing import List
 
 import numpy as np
 import onnxruntime
 
-from g2p_id.onnx_utils import WrapInferenceSession
+from g2p_id.onnx_utils import WrapInferenceSession, predict_in_chunks
 
 model_path = os.path.join(os.path.dirname(__file__), "models", "lstm")
 
@@ -62,28 +63,58 @@ class LSTM:
         Returns:
             str: Word in phonemes.
         """
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts: List[str]) -> List[str]:
+        """Performs batched LSTM inference, predicting phonemes of given words.
+        Words longer than `max_encoder_seq_length` are predicted in chunks.
+
+        Args:
+            texts (List[str]): Words to convert to phonemes.
+
+        Returns:
+            List[str]: Words in phonemes.
+        """
+        return predict_in_chunks(texts, self.config["max_encoder_seq_length"], self._predict_chunks)
+
+    def _predict_chunks(self, texts: List[str]) -> List[str]:
+        """Encodes words of at most `max_encoder_seq_length` characters, and decodes them greedily.
+        Words are dropped from the decoder batch once they emit an end-of-sequence token.
+
+        Args:
+            texts (List[str]): Words to convert to phonemes.
+
+        Returns:
+            List[str]: Words in phonemes.
+        """
+        if not texts:
+            return []
+
+        batch_size = len(texts)
         input_seq = np.zeros(
             (
-                1,
+                batch_size,
                 self.config["max_encoder_seq_length"],
                 self.config["num_encoder_tokens"],
             ),
             dtype="float32",
         )
 
-        for idx, char in enumerate(text):
-            input_seq[0, idx, self.g2id[char]] = 1.0
-        input_seq[0, len(text) :, self.g2id[self.config["pad_token"]]] = 1.0
+        for row, text in enumerate(texts):
+            for idx, char in enumerate(text):
+                input_seq[row, idx, self.g2id[char]] = 1.0
+            input_seq[row, len(text) :, self.g2id[self.config["pad_token"]]] = 1.0
 
         encoder_inputs = {"input_1": input_seq}
         states_value = self.encoder.run(None, encoder_inputs)
 
-        target_seq = np.zeros((1, 1, self.config["num_decoder_tokens"]), dtype="float32")
-        target_seq[0, 0, self.p2id[self.config["bos_token"]]] = 1.0
+        target_seq = np.zeros((batch_size, 1, self.config["num_decoder_tokens"]), dtype="float32")
+        target_seq[:, 0, self.p2id[self.config["bos_token"]]] = 1.0
 
-        stop_condition = False
-        decoded_sentence = ""
-        while not stop_condition:
+        # rows of words still being decoded
+        active = np.arange(batch_size)
+        decoded_sentences = [""] * batch_size
+        while active.size:
             decoder_inputs = {
                 "input_2": target_seq,
                 "input_3": states_value[0],
@@ -91,19 +122,22 @@ class LSTM:
             }
             output_tokens, state_memory, state_carry = self.decoder.run(None, decoder_inputs)
 
-            sampled_token_index = np.argmax(output_tokens[0, -1, :])
-            sampled_char = self.id2p[sampled_token_index]
-            decoded_sentence += sampled_char
+            sampled_token_indices = np.argmax(output_tokens[:, -1, :], axis=-1)
+            keep = []
+            for position, (row, sampled_token_index) in enumerate(zip(active.tolist(), sampled_token_indices.tolist())):
+                sampled_char = self.id2p[sampled_token_index]
+                decoded_sentences[row] += sampled_char
 
-            if (
-                sampled_char == self.config["eos_token"]
-                or len(decoded_sentence) > self.config["max_decoder_seq_length"]
-            ):
-                stop_condition = True
+                if (
+                    sampled_char != self.config["eos_token"]
+                    and len(decoded_sentences[row]) <= self.config["max_decoder_seq_length"]
+                ):
+                    keep.append(position)
 
-            target_seq = np.zeros((1, 1, self.config["num_decoder_tokens"]), dtype="float32")
-            target_seq[0, 0, sampled_token_index] = 1.0
+            active, sampled_token_indices = active[keep], sampled_token_indices[keep]
+            target_seq = np.zeros((active.size, 1, self.config["num_decoder_tokens"]), dtype="float32")
+            target_seq[np.arange(active.size), 0, sampled_token_indices] = 1.0
 
-            states_value = [state_memory, state_carry]
+            states_value = [state_memory[keep], state_carry[keep]]
 
-        return decoded_sentence.replace(self.config["eos_token"], "")
+        return [decoded_sentence.replace(self.config["eos_token"], "") for decoded_sentence in decoded_sentences]
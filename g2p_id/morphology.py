@@ -0,0 +1,170 @@
+"""
+Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from typing import List, Mapping, Optional, Tuple
+
+# (prefix, phonemes, letters a root may start with after it, root-initial letters it may replace)
+# `meN-` and `peN-` assimilate to the root's initial letter, and replace voiceless ones before vowels
+NASAL_ONSETS = {
+    "ŋ": "aeioughk",
+    "m": "bfpv",
+    "n": "cdjtz",
+    "": "lmnrwy",
+}
+PREFIXES: List[Tuple[str, str, Optional[str], Tuple[str, ...]]] = [
+    ("meng", "m ə ŋ", NASAL_ONSETS["ŋ"], ("k",)),
+    ("meny", "m ə ɲ", "", ("s",)),
+    ("mem", "m ə m", NASAL_ONSETS["m"], ("p",)),
+    ("men", "m ə n", NASAL_ONSETS["n"], ("t",)),
+    ("me", "m ə", NASAL_ONSETS[""], ()),
+    ("peng", "p ə ŋ", NASAL_ONSETS["ŋ"], ("k",)),
+    ("peny", "p ə ɲ", "", ("s",)),
+    ("pem", "p ə m", NASAL_ONSETS["m"], ("p",)),
+    ("pen", "p ə n", NASAL_ONSETS["n"], ("t",)),
+    ("pe", "p ə", NASAL_ONSETS[""], ()),
+    ("per", "p ə r", None, ()),
+    ("ber", "b ə r", None, ()),
+    ("be", "b ə", "r", ()),
+    ("ter", "t ə r", None, ()),
+    ("di", "d i", None, ()),
+    ("ke", "k ə", None, ()),
+    ("se", "s ə", None, ()),
+]
+
+# (suffix or clitic, phonemes)
+SUFFIXES: List[Tuple[str, str]] = [
+    ("nya", "ɲ a"),
+    ("lah", "l a h"),
+    ("kah", "k a h"),
+    ("pun", "p u n"),
+    ("ku", "k u"),
+    ("mu", "m u"),
+    ("kan", "k a n"),
+    ("an", "a n"),
+    ("i", "i"),
+]
+
+VOWELS = "aeiouə"
+
+# prefix phonemes in order, root, and whether the root's initial letter was replaced by the prefix
+Root = Tuple[List[str], str, bool]
+
+
+class Morphology:
+    """Rule-based Indonesian affix stripper, composing pronunciations of affixed words
+    from the lexicon entry of their root, e.g. `dibacakannya` -> `di` + `baca` + `kan` + `nya`.
+    Handles up to two prefixes, including the nasal assimilation of `meN-`/`peN-`
+    (e.g. `menulis` -> `men` + `tulis`), and up to three suffixes or clitics.
+    """
+
+    def __init__(
+        self,
+        lexicon: Mapping[str, str],
+        min_root_length: int = 3,
+        max_prefixes: int = 2,
+        max_suffixes: int = 3,
+    ):
+        """Constructor for Morphology.
+
+        Args:
+            lexicon (Mapping[str, str]): Lexicon to find roots in.
+            min_root_length (int, optional): Minimum number of letters of a root. Defaults to 3.
+            max_prefixes (int, optional): Maximum number of stacked prefixes. Defaults to 2.
+            max_suffixes (int, optional): Maximum number of stacked suffixes and clitics. Defaults to 3.
+        """
+        self.lexicon = lexicon
+        self.min_root_length = min_root_length
+        self.max_prefixes = max_prefixes
+        self.max_suffixes = max_suffixes
+
+    def _strip_suffixes(self, word: str) -> List[Tuple[str, List[str]]]:
+        """Lists all ways of stripping suffixes off `word`, including none.
+
+        Returns:
+            List[Tuple[str, List[str]]]: (stem, suffix phonemes in order) pairs.
+        """
+        candidates: List[Tuple[str, List[str]]] = [(word, [])]
+        stems = candidates
+        for _ in range(self.max_suffixes):
+            stripped = []
+            for stem, suffixes in stems:
+                for suffix, phonemes in SUFFIXES:
+                    if stem.endswith(suffix) and len(stem) - len(suffix) >= self.min_root_length:
+                        stripped.append((stem[: -len(suffix)], [phonemes] + suffixes))
+            candidates.extend(stripped)
+            stems = stripped
+        return candidates
+
+    def _find_root(self, stem: str, depth: int) -> Optional[Root]:
+        """Finds the longest lexicon root of `stem` after stripping up to `depth` prefixes.
+
+        Returns:
+            Optional[Root]: Prefix phonemes, root, and whether the root's initial letter was replaced.
+        """
+        if stem in self.lexicon:
+            return [], stem, False
+        if depth == 0:
+            return None
+
+        roots: List[Root] = []
+        for prefix, phonemes, onsets, initials in PREFIXES:
+            if not stem.startswith(prefix):
+                continue
+            rest = stem[len(prefix) :]
+            candidates: List[Optional[Root]] = []
+            if len(rest) >= self.min_root_length and (onsets is None or rest[:1] in onsets):
+                candidates.append(self._find_root(rest, depth - 1))
+            # replaced initials are only restored before vowels, e.g. `menulis`, not `mentari`
+            if rest[:1] in VOWELS:
+                candidates.extend(([], initial + rest, True) for initial in initials if initial + rest in self.lexicon)
+            roots.extend(([phonemes] + found[0], found[1], found[2]) for found in candidates if found is not None)
+        return max(roots, key=lambda root: len(root[1]), default=None)
+
+    def decompose(self, word: str) -> Optional[str]:
+        """Composes the pronunciation of an affixed word whose root is in the lexicon.
+        Of all decompositions, the one with the longest root is used.
+
+        Args:
+            word (str): Word to decompose.
+
+        Returns:
+            Optional[str]: Phoneme string, or None if no decomposition matches.
+        """
+        decompositions: List[Tuple[List[str], Root]] = []
+        for stem, suffixes in self._strip_suffixes(word):
+            found = self._find_root(stem, self.max_prefixes)
+            if found is not None and (suffixes or found[0]):
+                decompositions.append((suffixes, found))
+        best = max(decompositions, key=lambda decomposition: len(decomposition[1][1]), default=None)
+        if best is None:
+            return None
+
+        suffixes, (prefixes, root, replaced_initial) = best
+        root_phonemes = self.lexicon[root].split()
+        if replaced_initial:
+            root_phonemes = root_phonemes[1:]
+        # a final glottal stop is pronounced `k` before vowel-initial suffixes, e.g. `kedudukan`
+        if suffixes and root_phonemes and root_phonemes[-1] == "ʔ" and suffixes[0][0] in VOWELS:
+            root_phonemes[-1] = "k"
+
+        phonemes: List[str] = []
+        for morpheme in prefixes + [" ".join(root_phonemes)] + suffixes:
+            morpheme_phonemes = morpheme.split()
+            # identical vowels across a morpheme boundary are separated by a glottal stop, e.g. `diiris`
+            if phonemes and morpheme_phonemes and phonemes[-1] == morpheme_phonemes[0] and phonemes[-1] in VOWELS:
+                phonemes.append("ʔ")
+            phonemes.extend(morpheme_phonemes)
+        return " ".join(phonemes)
@@ -14,18 +14,97 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import os
+import tempfile
+from itertools import islice
+from typing import Callable, List
+
 import onnxruntime as ort
 
 
+DIGRAPHS = ("ng", "ny", "sy", "kh")
+VOWELS = "aeiou"
+
+
+def starts_syllable(text: str) -> bool:
+    """Checks whether text starts with a consonant or digraph followed by a vowel.
+
+    Args:
+        text (str): Text to check.
+
+    Returns:
+        bool: Whether a syllable can start at the beginning of text.
+    """
+    onset = 2 if text[:2] in DIGRAPHS else 1
+    return text[:1] not in VOWELS and text[onset : onset + 1] in VOWELS
+
+
+def split_into_chunks(text: str, max_length: int) -> List[str]:
+    """Splits text into near-equal chunks of at most `max_length` characters.
+
+    Chunks are preferably cut between a vowel and the onset of the next syllable, and never inside a digraph,
+    so that every chunk can be pronounced on its own.
+
+    Args:
+        text (str): Text to split.
+        max_length (int): Maximum length of a chunk.
+
+    Returns:
+        List[str]: Chunks of text.
+    """
+    chunks = []
+    start = 0
+    while len(text) - start > max_length:
+        remaining = len(text) - start
+        target = start + -(-remaining // -(-remaining // max_length))  # ceil(len / ceil(len / max_length))
+        cuts = sorted(range(start + 1, start + max_length + 1), key=lambda cut: abs(cut - target))
+        whole = [cut for cut in cuts if text[cut - 1 : cut + 1] not in DIGRAPHS]
+        syllable = [cut for cut in whole if text[cut - 1] in VOWELS and starts_syllable(text[cut:])]
+        cut = (syllable or whole or [start + max_length])[0]
+        chunks.append(text[start:cut])
+        start = cut
+    chunks.append(text[start:])
+    return chunks
+
+
+def predict_in_chunks(texts: List[str], max_length: int, predict: Callable[[List[str]], List[str]]) -> List[str]:
+    """Runs batched inference on texts which may be longer than a model's fixed input length,
+    by splitting them into chunks of at most `max_length` characters and joining the chunks' predictions.
+
+    Args:
+        texts (List[str]): Texts to predict from.
+        max_length (int): Maximum input length of the model.
+        predict (Callable[[List[str]], List[str]]): Batched inference on texts of at most `max_length` characters.
+
+    Returns:
+        List[str]: Predictions of every text.
+    """
+    chunks: List[str] = []
+    num_chunks: List[int] = []
+    for text in texts:
+        pieces = split_into_chunks(text, max_length)
+        chunks.extend(pieces)
+        num_chunks.append(len(pieces))
+
+    predictions = iter(predict(chunks))
+    return ["".join(islice(predictions, count)) for count in num_chunks]
+
+
 class WrapInferenceSession:
     """Wrapper class for serializing ONNX InferenceSession objects.
     Based on: https://github.com/microsoft/onnxruntime/pull/800#issuecomment-844326099
     """
 
-    def __init__(self, onnx_bytes, sess_options=None, providers=None):
+    def __init__(self, onnx_bytes, sess_options=None, providers=None, optimized=False):
+        if optimized and sess_options is None:
+            # graph optimizations were already applied, see `optimize`
+            sess_options = ort.SessionOptions()
+            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
         self.sess = ort.InferenceSession(onnx_bytes, sess_options=sess_options, providers=providers)
         self.onnx_bytes = onnx_bytes
+        self.sess_options = sess_options
         self.providers = providers
+        self.optimized = optimized
 
     def run(self, *args):
         """Wrapper for ONNX InferenceSession run method.
@@ -35,10 +114,35 @@ class WrapInferenceSession:
         """
         return self.sess.run(*args)
 
+    def reload(self):
+        """Recreates the InferenceSession, e.g. in a forked child process, where the inherited session
+        and its thread pools are not safe to use.
+        """
+        self.sess = ort.InferenceSession(self.onnx_bytes, sess_options=self.sess_options, providers=self.providers)
+
+    def optimize(self) -> "WrapInferenceSession":
+        """Creates a session from the model after ONNX Runtime's graph optimizations, serialized in memory,
+        so that creating it again skips them, e.g. when unpickled from `G2p.save_snapshot`.
+        Optimized models may depend on the ONNX Runtime version and hardware they were optimized with.
+
+        Returns:
+            WrapInferenceSession: Session of the optimized model.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            sess_options = ort.SessionOptions()
+            sess_options.optimized_model_filepath = os.path.join(directory, "model.onnx")
+            ort.InferenceSession(self.onnx_bytes, sess_options=sess_options, providers=self.providers)
+            with open(sess_options.optimized_model_filepath, "rb") as file:
+                onnx_bytes = file.read()
+        return WrapInferenceSession(onnx_bytes, providers=self.providers, optimized=True)
+
     def __getstate__(self):
-        return {"onnx_bytes": self.onnx_bytes}
+        return {"onnx_bytes": self.onnx_bytes, "providers": self.providers, "optimized": self.optimized}
 
     def __setstate__(self, values):
-        self.onnx_bytes = values["onnx_bytes"]
-        self.providers = values.get("providers", None)
-        self.sess = ort.InferenceSession(self.onnx_bytes, self.providers)
+        providers = values.get("providers", None)
+        if providers is not None:  # may be unpickled on another machine
+            providers = [provider for provider in providers if provider in ort.get_available_providers()]
+        self.__init__(
+            values["onnx_bytes"], providers=providers, optimized=values.get("optimized", False)
+        )
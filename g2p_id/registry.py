@@ -0,0 +1,56 @@
+"""
+Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+_shared_resources: Dict[Hashable, Any] = {}
+_lock = threading.RLock()
+
+
+def load_shared(key: Hashable, factory: Callable[[], Any]) -> Any:
+    """Returns the process-wide resource stored under `key`, creating it with `factory` on first use.
+    Resources are loaded once per process and shared by all `G2p` instances, so they must never be mutated.
+    Mappings should be stored read-only, e.g. as `types.MappingProxyType`.
+
+    Args:
+        key (Hashable): Resource key, e.g. `("lexicon", path)`.
+        factory (Callable[[], Any]): Function creating the resource.
+
+    Returns:
+        Any: Shared resource.
+    """
+    with _lock:
+        if key not in _shared_resources:
+            _shared_resources[key] = factory()
+        return _shared_resources[key]
+
+
+def store_shared(resources: Dict[Hashable, Any]):
+    """Stores resources, e.g. restored by `G2p.load_snapshot`, under their keys, unless already loaded.
+
+    Args:
+        resources (Dict[Hashable, Any]): Resources by key.
+    """
+    with _lock:
+        for key, resource in resources.items():
+            _shared_resources.setdefault(key, resource)
+
+
+def clear_shared():
+    """Drops all shared resources. Existing `G2p` instances keep theirs, new instances reload them."""
+    with _lock:
+        _shared_resources.clear()
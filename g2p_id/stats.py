@@ -0,0 +1,119 @@
+"""
+Copyright 2023 [PT BOOKBOT INDONESIA](https://bookbot.id/)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+from typing import Callable, Dict, Optional
+
+STAGES = ("preprocess", "normalize", "tokenize", "tag", "lookup", "predict")
+COUNTERS = (
+    "words",
+    "word_cache_hits",
+    "non_alphabetic",
+    "homograph_hits",
+    "lexicon_hits",
+    "morphology_hits",
+    "oov_predictions",
+)
+
+
+class G2pStats:
+    """Opt-in per-stage timings and counters collector for `G2p`.
+
+    Stage timings are in seconds and do not overlap, so they add up to the total time spent in `G2p.__call__`:
+
+    - `preprocess`: tokenization, unicode and character filtering in `G2p._preprocess`
+    - `normalize`: `TextProcessor.normalize`
+    - `tokenize`: word tokenization of the preprocessed text
+    - `tag`: POS tagging
+    - `lookup`: homograph and lexicon lookup, and phoneme post-processing
+    - `predict`: neural network prediction of OOV words
+
+    Calls served from the `G2p` sentence cache are not recorded, see `G2p.cache_info` instead.
+
+    Counters are `words`, `word_cache_hits`, `non_alphabetic`, `homograph_hits`, `lexicon_hits`,
+    `morphology_hits` and `oov_predictions`. Words served from the word cache are only counted as `word_cache_hits`.
+    """
+
+    def __init__(self, callback: Optional[Callable[[Dict[str, float], Dict[str, int]], None]] = None):
+        """Constructor for G2pStats.
+
+        Args:
+            callback (Callable[[Dict[str, float], Dict[str, int]], None], optional):
+                Function called after every `G2p` call with that call's timings and counters,
+                e.g. to feed Prometheus histograms or OpenTelemetry spans. Defaults to None.
+        """
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.timings: Dict[str, float] = dict.fromkeys(STAGES, 0.0)
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_record():
+        """Creates empty timings and counters for a single call.
+
+        Returns:
+            Tuple[Dict[str, float], Dict[str, int]]: Zeroed timings and counters.
+        """
+        return dict.fromkeys(STAGES, 0.0), dict.fromkeys(COUNTERS, 0)
+
+    def update(self, timings: Dict[str, float], counters: Dict[str, int]):
+        """Accumulates a single call's timings and counters, then invokes the callback.
+
+        Args:
+            timings (Dict[str, float]): Seconds spent per stage.
+            counters (Dict[str, int]): Event counts.
+        """
+        with self._lock:
+            self.calls += 1
+            for stage, seconds in timings.items():
+                self.timings[stage] += seconds
+            for counter, count in counters.items():
+                self.counters[counter] += count
+        if self.callback is not None:
+            self.callback(timings, counters)
+
+    def reset_lock(self):
+        """Recreates the lock, e.g. in a forked child, where it may have been held by another thread of the parent."""
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Resets all accumulated timings and counters."""
+        with self._lock:
+            self.calls = 0
+            self.timings = dict.fromkeys(STAGES, 0.0)
+            self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Flattens accumulated values into metric-name keys, ready for export.
+
+        Returns:
+            Dict[str, float]: E.g. `{"calls": 3, "seconds_tag": 0.01, "lexicon_hits": 12, ...}`.
+        """
+        with self._lock:
+            metrics: Dict[str, float] = {"calls": self.calls}
+            metrics.update({f"seconds_{stage}": seconds for stage, seconds in self.timings.items()})
+            metrics.update(self.counters)
+        return metrics
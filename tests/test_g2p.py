@@ -1,3 +1,18 @@
+import gc
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import g2p_id.g2p as g2p_module
+from g2p_id import G2p, G2pStats, registry
+from g2p_id.g2p import PHONEME_INVENTORY, segment_phonemes
+from g2p_id.onnx_utils import DIGRAPHS, split_into_chunks
+
+
 def test_g2p(g2p):
     assert g2p("Apel itu berwarna merah.") == [
         ["a", "p", "ə", "l"],
@@ -57,6 +72,32 @@ def test_lstm(lstm):
     assert lstm.predict("merdeka") == "mərdeka"
     assert lstm.predict("pecel") == "pətʃəl"
     assert lstm.predict("lele") == "lele"
+    assert lstm.predict_batch(["mengembangkannya", "merdeka", "pecel", "lele"]) == [
+        "məŋəmbaŋkanɲa",
+        "mərdeka",
+        "pətʃəl",
+        "lele",
+    ]
+    assert lstm.predict_batch([]) == []
+
+    # longer than `max_encoder_seq_length`, predicted in two chunks
+    long_word = "mengembangkannya" * 2
+    assert lstm.predict(long_word) == lstm.predict(long_word[:16]) + lstm.predict(long_word[16:])
+
+    # the naive cut "mempertanggun|gjawabkannya" would split a digraph, cut before the next syllable instead
+    long_word = "mempertanggungjawabkannya"
+    assert split_into_chunks(long_word, 24) == ["mempertanggungja", "wabkannya"]
+    assert lstm.predict(long_word) == lstm.predict("mempertanggungja") + lstm.predict("wabkannya")
+
+
+def test_split_into_chunks():
+    assert split_into_chunks("merdeka", 24) == ["merdeka"]
+    assert split_into_chunks("x" * 60, 24) == ["x" * 20] * 3
+    for word in ["mempertanggungjawabkannya", "keberlangsungannya" * 2, "ketidakmenyenangkannya" * 3]:
+        chunks = split_into_chunks(word, 24)
+        assert "".join(chunks) == word
+        assert all(len(chunk) <= 24 for chunk in chunks)
+        assert all(left[-1] + right[0] not in DIGRAPHS for left, right in zip(chunks, chunks[1:]))
 
 
 def test_bert(bert):
@@ -65,6 +106,19 @@ def test_bert(bert):
     assert bert.predict("pecel") == "pəcel"
     assert bert.predict("lele") == "lele"
     assert bert.predict("banyak") == "banyak"
+    assert bert.predict_batch(["mengembangkannya", "merdeka", "pecel", "lele", "banyak"]) == [
+        "məngəmbangkannya",
+        "mərdeka",
+        "pəcel",
+        "lele",
+        "banyak",
+    ]
+    assert bert.predict_batch([]) == []
+
+    # longer than `max_seq_length`, predicted in two chunks
+    long_word = "mengembangkannya" * 3
+    assert bert.predict(long_word) == bert.predict(long_word[:18]) + bert.predict(long_word[18:])
+    assert bert.predict("xenon") == "ksenon"
 
 
 def test_ps(g2p):
@@ -75,7 +129,7 @@ def test_ps(g2p):
 
 def test_sticking_dot(g2p):
     assert g2p("Seniornya Brigadir Jendral A.Yani mengambil alih pimpinan.") == [
-        ["s", "ə", "n", "i", "ʔ", "o", "r", "ɲ", "a"],
+        ["s", "e", "n", "i", "ʔ", "o", "r", "ɲ", "a"],
         ["b", "r", "i", "ɡ", "a", "d", "i", "r"],
         ["dʒ", "ə", "n", "d", "r", "a", "l"],
         ["a"],
@@ -92,3 +146,292 @@ def test_onnx_wrapper(bert):
     model_state = bert.model.__getstate__()
     bert.model.__setstate__(model_state)
     assert bert.predict("mengembangkannya") == "məngəmbangkannya"
+
+
+def test_stats(g2p):
+    records = []
+    g2p.clear_cache()
+    g2p.stats = G2pStats(callback=lambda timings, counters: records.append(counters))
+    try:
+        g2p("Apel itu berwarna merah.")
+        g2p("keset mengembangkannya jayapura")
+        g2p("itu keset")
+    finally:
+        stats, g2p.stats = g2p.stats, None
+
+    assert stats.calls == 3
+    assert records == [
+        {
+            "words": 5,
+            "word_cache_hits": 0,
+            "non_alphabetic": 1,
+            "homograph_hits": 1,
+            "lexicon_hits": 3,
+            "morphology_hits": 0,
+            "oov_predictions": 0,
+        },
+        {
+            "words": 3,
+            "word_cache_hits": 0,
+            "non_alphabetic": 0,
+            "homograph_hits": 1,
+            "lexicon_hits": 0,
+            "morphology_hits": 1,
+            "oov_predictions": 1,
+        },
+        {
+            "words": 2,
+            "word_cache_hits": 1,
+            "non_alphabetic": 0,
+            "homograph_hits": 1,
+            "lexicon_hits": 0,
+            "morphology_hits": 0,
+            "oov_predictions": 0,
+        },
+    ]
+    metrics = stats.as_dict()
+    assert metrics["calls"] == 3
+    assert metrics["oov_predictions"] == 1
+    assert all(metrics[f"seconds_{stage}"] >= 0.0 for stage in stats.timings)
+    assert metrics["seconds_predict"] > 0.0
+    stats.reset()
+    assert stats.as_dict()["words"] == 0
+
+
+def test_word_cache():
+    g2p = G2p(word_cache_size=2)
+    assert g2p("Ini rumahnya Aisyah.") == [
+        ["i", "n", "i"],
+        ["r", "u", "m", "a", "h", "ɲ", "a"],
+        ["a", "ʔ", "i", "ʃ", "a", "h"],
+        ["."],
+    ]
+    # bounded, oldest entries are evicted first
+    assert list(g2p._word_cache) == ["aisyah", "."]
+    assert g2p._word_cache["aisyah"] == ("a", "ʔ", "i", "ʃ", "a", "h")
+    # results are copies of cached phonemes
+    prons = g2p("aisyah")
+    prons[0].append("x")
+    assert g2p("aisyah") == [["a", "ʔ", "i", "ʃ", "a", "h"]]
+    # homographs are never cached
+    assert g2p("apel") == [["a", "p", "ə", "l"]]
+    assert "apel" not in g2p._word_cache
+    g2p.clear_cache()
+    assert not g2p._word_cache
+
+
+def test_sentence_cache():
+    g2p = G2p(sentence_cache_size=1)
+    expected = [["k", "a", "k", "a", "k"], ["l", "a", "j", "a", "k"]]
+    assert g2p("kakak layak") == expected
+    prons = g2p("kakak layak")
+    assert prons == expected
+    # results are copies of cached phonemes
+    prons[0].clear()
+    assert g2p("kakak layak") == expected
+    assert g2p.cache_info() == {"hits": 2, "misses": 1, "size": 1, "maxsize": 1}
+    assert g2p("layak") == [["l", "a", "j", "a", "k"]]
+    assert list(g2p._sentence_cache) == ["layak"]
+    g2p.clear_cache()
+    assert g2p.cache_info() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 1}
+
+
+def test_preprocess(g2p):
+    assert g2p._preprocess("Café naïve, jum'at!") == "cafe naive , jum'at !"
+    assert g2p._preprocess("ＦＵＬＬ width 你好 #tag @user") == " width  tag user"
+    assert g2p._preprocess("Situ Bagendit 10 km") == "situ bagendit sepuluh kilometer"
+
+
+def test_to_ids(g2p):
+    text = "Ini rumahnya Aisyah dan Ceri."
+    output = g2p.to_ids(text)
+    assert output.ids.dtype == np.int16
+    assert output.offsets.tolist() == [0, 3, 10, 16, 19, 23, 24]
+    words = [
+        [output.inventory[idx] for idx in output.ids[start:end]]
+        for start, end in zip(output.offsets[:-1], output.offsets[1:])
+    ]
+    assert words == g2p(text)
+    assert g2p.to_ids("").offsets.tolist() == [0]
+
+
+def test_to_ids_lstm():
+    lstm_g2p = G2p(model_type="LSTM")
+    text = "zorblatz quorbin pecel"
+    output = lstm_g2p.to_ids(text)
+    # OOV predictions are segmented into phonemes, instead of adding whole words to the vocabulary
+    assert output.inventory == PHONEME_INVENTORY
+    words = [
+        [output.inventory[idx] for idx in output.ids[start:end]]
+        for start, end in zip(output.offsets[:-1], output.offsets[1:])
+    ]
+    assert words == lstm_g2p(text)
+    assert words[0] == ["s", "o", "r", "l", "u", "ʔ", "a", "t"]
+
+
+def test_segment_phonemes():
+    assert segment_phonemes("pətʃəl") == "p ə tʃ ə l"
+    assert segment_phonemes("dʒajapura") == "dʒ a j a p u r a"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_prepare_for_fork():
+    g2p = G2p(morphology=False, stats=G2pStats())
+    session = g2p.model.model.sess
+    g2p.prepare_for_fork()
+    try:
+        read_fd, write_fd = os.pipe()
+        # as if other threads of the parent were inside `G2p` at fork time
+        locks = [g2p._lock, g2p.stats._lock]
+        for lock in locks:
+            lock.acquire()
+        pid = os.fork()
+        if pid == 0:  # child
+            os.close(read_fd)
+            reloaded = g2p.model.model.sess is not session
+            os.write(write_fd, f"{reloaded} {g2p('mengembangkannya')}".encode())
+            os._exit(0)
+        for lock in locks:
+            lock.release()
+        os.close(write_fd)
+        with os.fdopen(read_fd) as file:
+            output = file.read()
+        os.waitpid(pid, 0)
+    finally:
+        gc.unfreeze()
+
+    assert output == "True [['m', 'ə', 'ŋ', 'ə', 'm', 'b', 'a', 'ŋ', 'k', 'a', 'n', 'ɲ', 'a']]"
+    assert g2p.model.model.sess is session
+
+
+def test_pickle():
+    g2p = G2p(stats=G2pStats(), sentence_cache_size=10)
+    expected = g2p("Apel itu berwarna merah, zorblatz.")
+    ids = g2p.to_ids("zorblatz quorbin")
+
+    copy = pickle.loads(pickle.dumps(g2p))
+    assert copy("Apel itu berwarna merah, zorblatz.") == expected
+    assert copy.cache_info()["hits"] == 1
+    assert copy.stats.calls == g2p.stats.calls
+    assert copy.phoneme2id.inventory == g2p.phoneme2id.inventory
+    copy_ids = copy.to_ids("zorblatz quorbin")
+    assert copy_ids.inventory == ids.inventory
+    assert np.array_equal(copy_ids.ids, ids.ids)
+    assert copy.morphology is not None and copy.morphology.lexicon is copy.lexicon2features
+    with pytest.raises(TypeError):
+        copy.lexicon2features["apel"] = "a p ə l"
+
+    rules = G2p(model_type="RULES", morphology=False)
+    copy = pickle.loads(pickle.dumps(rules))
+    assert copy.morphology is None
+    assert copy("keset mengembangkannya jayapura") == rules("keset mengembangkannya jayapura")
+
+
+def test_shared_resources(g2p):
+    other = G2p(word_cache_size=0)
+    assert other.lexicon2features is g2p.lexicon2features
+    assert other.tagger is g2p.tagger
+    assert other.normalizer is g2p.normalizer
+    assert other.model is g2p.model
+    assert other._word_cache is not g2p._word_cache
+
+    lstm_g2p = G2p(model_type="LSTM")
+    assert lstm_g2p.lexicon2features is g2p.lexicon2features
+    assert lstm_g2p.model is not g2p.model
+
+    # shared lexicons are read-only, per-instance overrides go through `user_lexicon`
+    with pytest.raises(TypeError):
+        g2p.lexicon2features["apel"] = "a p ə l"
+    with pytest.raises(TypeError):
+        del g2p.homograph2features["apel"]
+
+
+def test_map_threads():
+    words = ["apel", "merah", "keset", "mengembangkannya", "berakhirnya", "kecolongan", "jayapura", "pecel", "lele"]
+    texts = [" ".join(words[i % len(words) :] + words[: i % len(words)][:3]) + "." for i in range(200)]
+    expected = G2p(word_cache_size=0)
+    expected = [expected(text) for text in texts]
+
+    stats = G2pStats()
+    g2p = G2p(stats=stats, word_cache_size=5, sentence_cache_size=3)
+    for _ in range(3):
+        assert g2p.map_threads(texts, max_workers=8) == expected
+
+    info = g2p.cache_info()
+    assert info["hits"] + info["misses"] == 3 * len(texts)
+    assert stats.calls == info["misses"]
+    assert stats.counters["words"] == sum(
+        stats.counters[counter]
+        for counter in [
+            "word_cache_hits",
+            "non_alphabetic",
+            "homograph_hits",
+            "lexicon_hits",
+            "morphology_hits",
+            "oov_predictions",
+        ]
+    )
+    assert len(g2p._word_cache) <= 5
+    assert len(g2p._sentence_cache) <= 3
+
+
+def test_rules_model():
+    script = (
+        "import sys\n"
+        "from g2p_id import G2p\n"
+        "g2p = G2p(model_type='RULES')\n"
+        "print(g2p('geret jayapura'), 'onnxruntime' in sys.modules)\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    assert output.strip() == "[['ɡ', 'ə', 'r', 'e', 't'], ['dʒ', 'a', 'j', 'a', 'p', 'u', 'r', 'a']] False"
+
+    g2p = G2p(model_type="RULES", refine=True)
+    assert g2p.model is None
+    assert g2p._rule_based_e("geret") == "gəret"
+    assert g2p("geret") == [["ɡ", "ə", "r", "e", "t"]]
+    assert g2p.wait_for_refinement(timeout=30)
+    assert g2p("geret") == [["ɡ", "e", "r", "e", "t"]]
+    assert g2p("geret") == G2p()("geret")
+
+
+def test_refine_with_sentence_cache():
+    g2p = G2p(model_type="RULES", refine=True, sentence_cache_size=10)
+    assert g2p("geret itu") == [["ɡ", "ə", "r", "e", "t"], ["i", "t", "u"]]
+    assert g2p.wait_for_refinement(timeout=30)
+    # sentences with words pending refinement are not cached
+    assert g2p("geret itu") == [["ɡ", "e", "r", "e", "t"], ["i", "t", "u"]]
+    assert g2p("geret itu") == [["ɡ", "e", "r", "e", "t"], ["i", "t", "u"]]
+    assert g2p.cache_info()["hits"] == 1
+
+    with pytest.raises(ValueError):
+        G2p(model_type="RULES", refine=True, word_cache_size=0)
+
+
+def test_snapshot(g2p, tmp_path, monkeypatch):
+    text = "Apel itu berwarna merah, mengembangkannya dengan geret."
+    snapshot_path = str(tmp_path / "g2p.pkl")
+    g2p.save_snapshot(snapshot_path)
+
+    # a fresh process: resources must come from the snapshot, not be constructed
+    monkeypatch.setattr(registry, "_shared_resources", {})
+    monkeypatch.setattr(g2p_module, "construct_lexicon_dictionary", None)
+    monkeypatch.setattr(g2p_module, "construct_model", None)
+    loaded = G2p.load_snapshot(snapshot_path)
+    assert loaded(text) == g2p(text)
+    assert loaded.model.model.optimized
+    assert loaded.word_cache_size == g2p.word_cache_size
+
+    rules_path = str(tmp_path / "rules.pkl")
+    G2p(model_type="RULES", morphology=False).save_snapshot(rules_path)
+    monkeypatch.setattr(registry, "_shared_resources", {})
+    rules = G2p.load_snapshot(rules_path)
+    assert rules.model is None
+    assert rules.morphology is None
+    assert rules("geret") == [["ɡ", "ə", "r", "e", "t"]]
+
+    with open(snapshot_path, "rb") as file:
+        header = pickle.load(file)
+    with open(snapshot_path, "wb") as file:
+        pickle.dump({**header, "version": 0}, file)
+    with pytest.raises(ValueError):
+        G2p.load_snapshot(snapshot_path)
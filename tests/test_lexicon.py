@@ -0,0 +1,22 @@
+import pytest
+
+from g2p_id import G2p, expand_lexicon, write_lexicon
+
+
+def test_expand_lexicon(g2p, tmp_path):
+    lexicon = expand_lexicon(["Jayapura pecel, apel dan lele!", "lele 123 mengembangkannya"], g2p=g2p)
+    assert lexicon == {"jayapura": "dʒ a j a p u r a", "lele": "l e l e"}
+
+    lexicon_path = tmp_path / "lexicon.tsv"
+    write_lexicon({**lexicon, "lele": "l ə l ə"}, str(lexicon_path))
+    assert lexicon_path.read_text(encoding="utf-8") == "jayapura\tdʒ a j a p u r a\nlele\tl ə l ə\n"
+
+    user_g2p = G2p(user_lexicon=str(lexicon_path))
+    assert user_g2p.lexicon2features["lele"] == "l ə l ə"
+    assert "lele" not in g2p.lexicon2features
+    assert user_g2p("lele apel") == [["l", "ə", "l", "ə"], ["a", "p", "ə", "l"]]
+
+
+def test_expand_lexicon_without_model():
+    with pytest.raises(ValueError):
+        expand_lexicon(["jayapura"], g2p=G2p(model_type="RULES"))
@@ -0,0 +1,23 @@
+from g2p_id import Morphology
+
+
+def test_decompose(g2p):
+    morphology = g2p.morphology
+    assert morphology.decompose("mengembangkannya") == "m ə ŋ ə m b a ŋ k a n ɲ a"
+    assert morphology.decompose("menulisnya") == "m ə n u l i s ɲ a"
+    assert morphology.decompose("diirisnya") == "d i ʔ i r i s ɲ a"
+    assert morphology.decompose("kedudukan") == "k ə d u d u k a n"
+    assert morphology.decompose("tanahnya") == "t a n a h ɲ a"
+    assert morphology.decompose("jayapura") is None
+    assert morphology.decompose("tulis") is None
+
+
+def test_custom_lexicon():
+    morphology = Morphology({"baca": "b a tʃ a", "pukul": "p u k u l"})
+    assert morphology.decompose("dibacakannya") == "d i b a tʃ a k a n ɲ a"
+    assert morphology.decompose("memukul") == "m ə m u k u l"
+    assert morphology.decompose("pemukulan") == "p ə m u k u l a n"
+    assert morphology.decompose("bacaan") == "b a tʃ a ʔ a n"
+    assert morphology.decompose("membaca") == "m ə m b a tʃ a"
+    assert morphology.decompose("dibaca") == "d i b a tʃ a"
+    assert Morphology({"baca": "b a tʃ a"}, max_prefixes=1).decompose("diperbaca") is None